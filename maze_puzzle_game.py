@@ -1,4 +1,23 @@
 from search import *
+import search_numba
+
+
+def solve(maze, start, goal, method='bfs'):
+    """Grazina veiksmu seka nuo start iki goal arba None, jei kelio nera.
+    method: 'bfs' (paieska i ploti) arba 'astar' (A* su Manhattan euristika).
+    Jei idiegta Numba, naudojamos sukompiliuotos search_numba funkcijos.
+    Daug kartu ieskant tame paciame labirinte verta naudoti search_numba.make_solver."""
+    if method not in ('bfs', 'astar'):
+        raise ValueError("method must be either 'bfs' or 'astar'.")
+    if search_numba.NUMBA_AVAILABLE:
+        return search_numba.make_solver(maze, method)(start, goal)
+    puzzle = MazePuzzle(start, goal, maze)
+    if method == 'bfs':
+        node = breadth_first_graph_search(puzzle)
+    else:
+        node = best_first_graph_search(puzzle, lambda n: n.path_cost + puzzle.h(n), queue=BucketPQ, early_goal_test=True)
+    return node.solution() if node else None
+
 
 maze = [
     ['.', '.', '.', '#', '.'],
@@ -15,6 +34,20 @@ puzzle = MazePuzzle((0, 0), (4, 4), maze)
 solution = breadth_first_graph_search(puzzle).solution()
 print("BFS Solution:", solution)
 
+# Kvieciamas dvikryptis paieskos i ploti algoritmas
+solution = bidirectional_breadth_first_search(puzzle).solution()
+print("Bidirectional BFS Solution:", solution)
+
 # Kvieciamas pirmo geriausio grafo algoritmas naudojant euristika
-solution = best_first_graph_search(puzzle, lambda n: puzzle.h(n)).solution()
-print("A* Solution:", solution)
\ No newline at end of file
+# Euristikos reiksmes yra nedideli sveikieji skaiciai, todel naudojama BucketPQ eile
+solution = best_first_graph_search(puzzle, lambda n: puzzle.h(n), queue=BucketPQ, early_goal_test=True).solution()
+print("A* Solution:", solution)
+
+# Kvieciama solve funkcija, kuri naudoja Numba, jei ji idiegta
+print("solve() BFS Solution:", solve(maze, (0, 0), (4, 4)))
+print("solve() A* Solution:", solve(maze, (0, 0), (4, 4), 'astar'))
+
+# Atstumai iki artimiausio is keliu pradiniu langeliu apskaiciuojami viena paieska i ploti
+dist, parents = search_numba.bfs_multisource(puzzle, [(0, 0), (4, 4)])
+print("Multi-source BFS distances:")
+print(dist)
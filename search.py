@@ -16,6 +16,8 @@ import decimal
 
 import random
 
+import numpy as np
+
 class Problem:
     """The abstract class for a formal problem. You should subclass
     this and implement the methods actions and result, and possibly
@@ -42,6 +44,20 @@ class Problem:
         self.actions(state)."""
         raise NotImplementedError
 
+    def successors(self, state):
+        """Return (action, next_state) pairs for every action that can be
+        executed in the given state. The default method combines actions and
+        result; override it if the transitions can be computed more cheaply
+        in one go."""
+        return [(action, self.result(state, action)) for action in self.actions(state)]
+
+    def expand(self, node):
+        """Yield (action, next_state, path_cost) for every successor of node,
+        where path_cost is the total cost of reaching next_state through node.
+        Search loops use this to build child nodes only when they need them."""
+        for action, next_state in self.successors(node.state):
+            yield action, next_state, self.path_cost(node.path_cost, node.state, action, next_state)
+
     def goal_test(self, state):
         """Return True if the state is a goal. The default method compares the
         state to self.goal or checks for state in self.goal if it is a
@@ -77,15 +93,21 @@ class Node:
     an explanation of how the f and h values are handled. You will not need to
     subclass this class."""
 
-    def __init__(self, state, parent=None, action=None, path_cost=0):
-        """Create a search tree Node, derived from a parent by an action."""
+    # f and h have slots too, because best_first_graph_search caches f on nodes
+    # and heuristics may store h
+    __slots__ = ('state', 'parent', 'action', 'path_cost', 'depth', 'f', 'h', '_hash')
+
+    def __init__(self, state, parent=None, action=None, path_cost=0, depth=None):
+        """Create a search tree Node, derived from a parent by an action.
+        Search loops that already know the depth pass it explicitly."""
         self.state = state
+        self._hash = hash(state)
         self.parent = parent
         self.action = action
         self.path_cost = path_cost
-        self.depth = 0
-        if parent:
-            self.depth = parent.depth + 1
+        if depth is None:
+            depth = parent.depth + 1 if parent else 0
+        self.depth = depth
 
     def __repr__(self):
         return "<Node {}>".format(self.state)
@@ -94,9 +116,10 @@ class Node:
         return self.state < node.state
 
     def expand(self, problem):
-        """List the nodes reachable in one step from this node."""
-        return [self.child_node(problem, action)
-                for action in problem.actions(self.state)]
+        """Yield the nodes reachable in one step from this node."""
+        depth = self.depth + 1
+        for action, next_state, path_cost in problem.expand(self):
+            yield Node(next_state, self, action, path_cost, depth)
 
     def child_node(self, problem, action):
         """[Figure 3.10]"""
@@ -106,15 +129,21 @@ class Node:
 
     def solution(self):
         """Return the sequence of actions to go from the root to this node."""
-        return [node.action for node in self.path()[1:]]
+        actions = [None] * self.depth
+        node = self
+        for i in range(self.depth - 1, -1, -1):
+            actions[i] = node.action
+            node = node.parent
+        return actions
 
     def path(self):
         """Return a list of nodes forming the path from the root to this node."""
-        node, path_back = self, []
-        while node:
-            path_back.append(node)
+        path = [None] * (self.depth + 1)
+        node = self
+        for i in range(self.depth, -1, -1):
+            path[i] = node
             node = node.parent
-        return list(reversed(path_back))
+        return path
 
     # We want for a queue of nodes in breadth_first_graph_search or
     # astar_search to have no duplicated states, so we treat nodes
@@ -128,8 +157,22 @@ class Node:
         # We use the hash value of the state
         # stored in the node instead of the node
         # object itself to quickly search a node
-        # with the same state in a Hash Table
-        return hash(self.state)
+        # with the same state in a Hash Table.
+        # It is computed once in __init__, as states never change.
+        return self._hash
+# ______________________________________________________________________________
+
+
+def explored_map(problem):
+    """Return an empty map for marking states as explored, read with
+    explored[state] and written with explored[state] = True. A problem whose
+    states are packed ints over a grid exposes the grid's shape and gets a
+    flat bytearray bitmap; any other problem gets a FlagDict."""
+    shape = getattr(problem, 'shape', None)
+    if shape is not None:
+        return bytearray(math.prod(shape))
+    return FlagDict()
+
 # ______________________________________________________________________________
 # Uninformed Search algorithms
 
@@ -144,7 +187,9 @@ def breadth_first_graph_search(problem, step_limits = -1):
     if problem.goal_test(node.state):
         return node
     frontier = deque([node])
-    explored = set()
+    # A state is reached once it is explored or waiting in the frontier
+    reached = explored_map(problem)
+    reached[node.state] = True
     step_num = 0
     while frontier:
         step_num = step_num + 1
@@ -153,28 +198,101 @@ def breadth_first_graph_search(problem, step_limits = -1):
         if step_limits > 0 and step_num >= step_limits:  # its for debug
             return node
 
-        explored.add(node.state)
-        for child in node.expand(problem):
-            if child.state not in explored and child not in frontier:
-                if problem.goal_test(child.state):
+        depth = node.depth + 1
+        for action, state, path_cost in problem.expand(node):
+            if not reached[state]:
+                child = Node(state, node, action, path_cost, depth)
+                if problem.goal_test(state):
                     return child
                 frontier.append(child)
+                reached[state] = True
     return None
 
 
-def best_first_graph_search(problem, f, display=False):
+def bidirectional_breadth_first_search(problem):
+    """Breadth-first search from the initial state and from the goal at the
+    same time, stopping as soon as the two searches meet. Each step expands a
+    whole level of whichever frontier is smaller, which keeps the returned
+    path a shortest one while generating roughly 2*b^(d/2) nodes instead of
+    b^d. The problem must have a single goal state, unit step costs, and be
+    reversible: if action leads from s1 to s2 then problem.reverse_action(action)
+    leads from s2 back to s1."""
+    start, goal = problem.initial, problem.goal
+    if problem.goal_test(start):
+        return Node(start)
+    # state -> (neighbouring state, action) towards the initial state or the goal
+    parents_fwd = {start: None}
+    parents_bwd = {goal: None}
+    frontier_fwd, frontier_bwd = [start], [goal]
+    meet = None
+    while frontier_fwd and frontier_bwd and meet is None:
+        if len(frontier_fwd) <= len(frontier_bwd):
+            frontier_fwd, meet = _expand_level(problem, frontier_fwd, parents_fwd, parents_bwd, False)
+        else:
+            frontier_bwd, meet = _expand_level(problem, frontier_bwd, parents_bwd, parents_fwd, True)
+    if meet is None:
+        return None
+
+    steps = []
+    state = meet
+    while parents_fwd[state] is not None:
+        prev_state, action = parents_fwd[state]
+        steps.append((action, state))
+        state = prev_state
+    steps.reverse()
+    state = meet
+    while parents_bwd[state] is not None:
+        state, action = parents_bwd[state]
+        steps.append((action, state))
+
+    node = Node(start)
+    for action, state in steps:
+        node = Node(state, node, action, problem.path_cost(node.path_cost, node.state, action, state))
+    return node
+
+
+def _expand_level(problem, frontier, parents, other_parents, backward):
+    """Expand every state in frontier for bidirectional_breadth_first_search.
+    Return the next level and the first state also reached by the other
+    search, or None."""
+    next_frontier = []
+    for state in frontier:
+        for action, next_state in problem.successors(state):
+            if next_state in parents:
+                continue
+            parents[next_state] = (state, problem.reverse_action(action) if backward else action)
+            if next_state in other_parents:
+                return next_frontier, next_state
+            next_frontier.append(next_state)
+    return next_frontier, None
+
+
+def best_first_graph_search(problem, f, display=False, queue=HeapPQ, early_goal_test=False):
     """Search the nodes with the lowest f scores first.
     You specify the function f(node) that you want to minimize; for example,
     if f is a heuristic estimate to the goal, then we have greedy best
     first search; if f is node.depth then we have breadth-first search.
-    There is a subtlety: the line "f = memoize(f, 'f')" means that the f
-    values will be cached on the nodes as they are computed. So after doing
-    a best first search you can examine the f values of the path returned."""
-    f = memoize(f, 'f')
+    There is a subtlety: f is evaluated once per node, when the node is
+    pushed, and the value is cached in node.f. So after doing a best first
+    search you can examine the f values of the path returned.
+    Nodes are goal-tested when they are popped, which keeps uniform-cost
+    (f = g) and A* (f = g + h) search optimal. With early_goal_test=True,
+    children are goal-tested as soon as they are generated instead, saving
+    the final push and pop of the goal. Only use it for greedy search, which
+    is not optimal anyway, or for A* when every step costs 1 and h(n) >= 1
+    for every non-goal node n, as with MazePuzzle and the Manhattan distance;
+    otherwise a longer path to the goal can be returned.
+    queue is the frontier class; pass BucketPQ when f always returns a small
+    non-negative int."""
+    def eval_f(node, f=f):
+        # The queue calls this exactly once per node, from append
+        value = node.f = f(node)
+        return value
+
     node = Node(problem.initial)
-    frontier = PriorityQueue('min', f)
+    frontier = queue('min', eval_f)
     frontier.append(node)
-    explored = set()
+    explored = explored_map(problem)
     step_num = 0
     while frontier:
         step_num = step_num + 1
@@ -182,55 +300,115 @@ def best_first_graph_search(problem, f, display=False):
         node = frontier.pop()
         if problem.goal_test(node.state):
             if display:
-                print(len(explored), "paths have been expanded and", len(frontier), "paths remain in the frontier")
+                print(step_num - 1, "paths have been expanded and", len(frontier), "paths remain in the frontier")
             return node
-        explored.add(node.state)
-        for child in node.expand(problem):
-            if child.state not in explored and child not in frontier:
-                frontier.append(child)
-            elif child in frontier:
-                if f(child) < frontier[child]:
-                    del frontier[child]
-                    frontier.append(child)
+        explored[node.state] = True
+        depth = node.depth + 1
+        for action, state, path_cost in problem.expand(node):
+            if early_goal_test and problem.goal_test(state):
+                if display:
+                    print(step_num, "paths have been expanded and", len(frontier), "paths remain in the frontier")
+                return Node(state, node, action, path_cost, depth)
+            if explored[state]:
+                continue
+            # The frontier keeps only the cheapest node for each state
+            frontier.append(Node(state, node, action, path_cost, depth))
     return None
 
 # ______________________________________________________________________________
 
+# Labirinto ejimai: eilutes poslinkis, stulpelio poslinkis ir veiksmo pavadinimas
+DX = np.array([-1, 1, 0, 0], np.int32)
+DY = np.array([0, 0, -1, 1], np.int32)
+ACTION = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+
+
+def maze_to_grid(maze):
+    """Labirintas is '.' ir '#' langeliu paverciamas uint8 tinkleliu (1 - galima praeiti, 0 - kliutis),
+    apgaubtu vieno langelio plocio sienu apvadu, todel tikrinant kaimynus nereikia ribu patikrinimo.
+    Langelis (x, y) tinklelyje yra (x + 1, y + 1)."""
+    return np.pad(np.array([[cell == '.' for cell in row] for row in maze], np.uint8), 1)
+
+
+def check_cell(xy, shape):
+    """Pakeliama ValueError, jei langelis (x, y) nepatenka i labirinta, kurio matmenys shape = (eilutes, stulpeliai)."""
+    x, y = xy
+    if not (0 <= x < shape[0] and 0 <= y < shape[1]):
+        raise ValueError("Cell {} is outside the {}x{} maze.".format((x, y), shape[0], shape[1]))
+
+
 class MazePuzzle(Problem):
+    REVERSE_ACTIONS = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+
     def __init__(self, initial, goal, maze):
         """Sukuriamas problemos mazePuzzle objektas.
         pradine busena: Tuple duomenu struktura reprezentuojanti pradine busena (x, y).
         goal: Tuple duomenu struktura reprezentuojanti galine busena (x, y).
-        maze: axb reiksmiu tinklelis turintis b eiliu, kur '.' galima praeiti ir '#' yra kliutis."""
-        super().__init__(initial, goal)
+        maze: axb reiksmiu tinklelis turintis b eiliu, kur '.' galima praeiti ir '#' yra kliutis.
+        Viduje busenos saugomos kaip sveikieji skaiciai - langeliu numeriai tinklelyje su sienu
+        apvadu (zr. maze_to_grid, encode ir decode)."""
+        # Supakuotas busenos numeris nepatikrina stulpelio, todel langeliai uz labirinto ribu atmetami is karto
+        check_cell(initial, (len(maze), len(maze[0])))
+        check_cell(goal, (len(maze), len(maze[0])))
         self.maze = maze
+        self.grid = maze_to_grid(maze)
+        self.shape = self.grid.shape
+        self.ncols = self.shape[1]
+        super().__init__(self.encode(initial), self.encode(goal))
+        # Labirintas nekinta, todel leistini perejimai is kiekvieno langelio apskaiciuojami viena karta.
+        # Apvado langeliai niekada nepasiekiami, todel ju kaimynu sarasai tusti.
+        cells = self.grid.ravel().tolist()
+        offsets = (DX * self.ncols + DY).tolist()
+        self._neighbors = [()] * len(cells)
+        for x in range(1, self.shape[0] - 1):
+            for y in range(1, self.ncols - 1):
+                state = x * self.ncols + y
+                self._neighbors[state] = tuple(
+                    (action, state + offset) for offset, action in zip(offsets, ACTION) if cells[state + offset])
+        # Galutine busena zinoma is anksto, todel euristikos reiksmes visoms busenoms apskaiciuojamos
+        # viena karta ir saugomos kaip Python int sarasas, indeksuojamas busena
+        rows, cols = np.indices(self.shape)
+        goal_x, goal_y = divmod(self.goal, self.ncols)
+        self._h = (np.abs(rows - goal_x) + np.abs(cols - goal_y)).ravel().tolist()
+
+    def encode(self, xy):
+        """Langelio koordinates (x, y) paverciamos busena (x + 1) * ncols + (y + 1)."""
+        return (xy[0] + 1) * self.ncols + xy[1] + 1
+
+    def decode(self, state):
+        """Busena paverciama atgal i langelio koordinates (x, y)."""
+        x, y = divmod(state, self.ncols)
+        return x - 1, y - 1
 
     def actions(self, state):
         """Grazinamas veiksmu sarasas, kuris gali buti ivykdytas pagal tikrinama busena"""
-        actions = []
-        x, y = state
-        if x > 0 and self.maze[x - 1][y] == '.':  # Up
-            actions.append('UP')
-        if x < len(self.maze) - 1 and self.maze[x + 1][y] == '.':  # Down
-            actions.append('DOWN')
-        if y > 0 and self.maze[x][y - 1] == '.':  # Left
-            actions.append('LEFT')
-        if y < len(self.maze[0]) - 1 and self.maze[x][y + 1] == '.':  # Right
-            actions.append('RIGHT')
-        return actions
+        return [action for action, _ in self.successors(state)]
+
+    def successors(self, state):
+        """Grazinamos (veiksmas, nauja busena) poros is is anksto apskaiciuotos lenteles"""
+        return self._neighbors[state]
+
+    def expand(self, node):
+        """Kiekvienas zingsnis kainuoja 1, todel kaina skaiciuojama viena karta visiems kaimynams"""
+        path_cost = node.path_cost + 1
+        for action, next_state in self._neighbors[node.state]:
+            yield action, next_state, path_cost
+
+    def reverse_action(self, action):
+        """Grazina veiksma, kuris grazina i ankstesne busena."""
+        return self.REVERSE_ACTIONS[action]
 
     def result(self, state, action):
         """ Pagal duota busena ir veiksma grazina naujos busenos rezultata
                 Action yra validus tikrinamos busenos veiksmas """
-        x, y = state
         if action == 'UP':
-            return (x - 1, y)
+            return state - self.ncols
         elif action == 'DOWN':
-            return (x + 1, y)
+            return state + self.ncols
         elif action == 'LEFT':
-            return (x, y - 1)
+            return state - 1
         elif action == 'RIGHT':
-            return (x, y + 1)
+            return state + 1
 
     def goal_test(self, state):
         """Grazina true jei tikrinama busena sutampa su galine."""
@@ -239,4 +417,4 @@ class MazePuzzle(Problem):
     def h(self, node):
         """Manhattan Distance euristine taisykle, skirta apskaičiuoti bendrą žingsnių skaičių,
          reikalingą tikslui pasiekti iš dabartinės padėties, neatsižvelgiant į kliūtis, kurios gali būti kelyje."""
-        return abs(node.state[0] - self.goal[0]) + abs(node.state[1] - self.goal[1])
\ No newline at end of file
+        return self._h[node.state]
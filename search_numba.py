@@ -0,0 +1,240 @@
+"""
+Compiled grid search for MazePuzzle mazes.
+
+The same searches as breadth_first_graph_search and an A* search, written
+against the uint8 grid built by maze_to_grid (1 = open cell, 0 = wall, with
+a one-cell wall border) with flat preallocated arrays instead of Node
+objects, sets and dicts, so Numba can compile them. The border means a
+neighbour of an inner cell is always inside the grid, so the kernels never
+check bounds; coordinates passed to them are grid coordinates, i.e. maze
+coordinates shifted by (1, 1). The kernels return a parents grid holding the
+flat index x * W + y of each reached cell's predecessor (-1 if unreached);
+path_from_parents turns it into the list of actions that Node.solution would
+return. Without Numba installed the kernels still run as plain Python, only
+slower.
+"""
+
+import numpy as np
+
+from search import DX, DY, ACTION, check_cell, maze_to_grid
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function uncompiled."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def bfs_grid(maze, sx, sy, gx, gy):
+    """Breadth-first search on a uint8 grid from (sx, sy) to (gx, gy).
+    Return the parents grid and whether the goal was reached."""
+    H, W = maze.shape
+    parents = np.full((H, W), -1, np.int32)
+    visited = np.zeros((H, W), np.bool_)
+    queue = np.empty(H * W, np.int32)
+    visited[sx, sy] = True
+    parents[sx, sy] = sx * W + sy
+    if sx == gx and sy == gy:
+        return parents, True
+    queue[0] = sx * W + sy
+    head, tail = 0, 1
+    while head < tail:
+        x, y = divmod(queue[head], W)
+        head += 1
+        for k in range(4):
+            nx = x + DX[k]
+            ny = y + DY[k]
+            if (maze[nx, ny] == 1) & (not visited[nx, ny]):
+                visited[nx, ny] = True
+                parents[nx, ny] = x * W + y
+                if nx == gx and ny == gy:
+                    return parents, True
+                queue[tail] = nx * W + ny
+                tail += 1
+    return parents, False
+
+
+@njit(cache=True)
+def _heap_push(keys, values, size, key, value):
+    """Push (key, value) onto a 4-ary min-heap stored in keys/values[:size]."""
+    i = size
+    while i > 0:
+        parent = (i - 1) >> 2
+        if keys[parent] <= key:
+            break
+        keys[i] = keys[parent]
+        values[i] = values[parent]
+        i = parent
+    keys[i] = key
+    values[i] = value
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(keys, values, size):
+    """Pop the minimum value from a 4-ary min-heap stored in keys/values[:size]."""
+    top = values[0]
+    size -= 1
+    key = keys[size]
+    value = values[size]
+    i = 0
+    while True:
+        first = 4 * i + 1
+        if first >= size:
+            break
+        child = first
+        for c in range(first + 1, min(first + 4, size)):
+            if keys[c] < keys[child]:
+                child = c
+        if key <= keys[child]:
+            break
+        keys[i] = keys[child]
+        values[i] = values[child]
+        i = child
+    keys[i] = key
+    values[i] = value
+    return top, size
+
+
+@njit(cache=True)
+def astar_grid(maze, sx, sy, gx, gy):
+    """A* search with unit step costs and the Manhattan heuristic on a uint8
+    grid from (sx, sy) to (gx, gy). The frontier is a flat 4-ary heap with
+    lazy deletion: a cheaper path pushes a new entry and stale entries are
+    skipped once their cell is closed. Return the parents grid and whether
+    the goal was reached."""
+    H, W = maze.shape
+    parents = np.full((H, W), -1, np.int32)
+    g = np.full((H, W), np.iinfo(np.int32).max, np.int32)
+    closed = np.zeros((H, W), np.bool_)
+    capacity = 4 * H * W + 1
+    keys = np.empty(capacity, np.int32)
+    values = np.empty(capacity, np.int32)
+    g[sx, sy] = 0
+    parents[sx, sy] = sx * W + sy
+    size = _heap_push(keys, values, 0, abs(sx - gx) + abs(sy - gy), sx * W + sy)
+    while size > 0:
+        cell, size = _heap_pop(keys, values, size)
+        x, y = divmod(cell, W)
+        if closed[x, y]:
+            continue
+        if x == gx and y == gy:
+            return parents, True
+        closed[x, y] = True
+        cost = g[x, y] + 1
+        for k in range(4):
+            nx = x + DX[k]
+            ny = y + DY[k]
+            if (maze[nx, ny] == 1) & (cost < g[nx, ny]):
+                g[nx, ny] = cost
+                parents[nx, ny] = cell
+                size = _heap_push(keys, values, size, cost + abs(nx - gx) + abs(ny - gy), nx * W + ny)
+    return parents, False
+
+
+def path_from_parents(parents, start, goal):
+    """Walk the parents grid back from goal and return the actions leading
+    from start to goal."""
+    W = parents.shape[1]
+    actions = []
+    x, y = goal
+    while (x, y) != tuple(start):
+        px, py = divmod(int(parents[x, y]), W)
+        for k in range(4):
+            if px + DX[k] == x and py + DY[k] == y:
+                actions.append(ACTION[k])
+                break
+        x, y = px, py
+    actions.reverse()
+    return actions
+
+
+def make_solver(maze, method='bfs'):
+    """Prepare maze for repeated queries and return solve(start, goal), which
+    returns the actions from start to goal in maze coordinates, or None if
+    there is no path. The padded grid is built once here rather than on every
+    query; the kernels themselves are compiled once per argument types and
+    cached on disk, so every solver shares the same machine code. Raises
+    ValueError if start or goal is outside the maze."""
+    if method not in ('bfs', 'astar'):
+        raise ValueError("method must be either 'bfs' or 'astar'.")
+    kernel = bfs_grid if method == 'bfs' else astar_grid
+    grid = maze_to_grid(maze)
+    shape = (grid.shape[0] - 2, grid.shape[1] - 2)
+
+    def solve(start, goal):
+        # The kernels do no bounds checking, so cells must be validated here
+        check_cell(start, shape)
+        check_cell(goal, shape)
+        start, goal = (start[0] + 1, start[1] + 1), (goal[0] + 1, goal[1] + 1)
+        parents, found = kernel(grid, start[0], start[1], goal[0], goal[1])
+        return path_from_parents(parents, start, goal) if found else None
+
+    return solve
+
+
+@njit(cache=True)
+def bfs_multisource_grid(maze, sources):
+    """Level-synchronous breadth-first search on a uint8 grid from every cell
+    in sources (flat grid indices) at once. Each level is a contiguous slice
+    of the queue that only reads the previous level, which is the shape a
+    parallel version would split across threads. Return flat int32 arrays
+    of distances to the nearest source and of parents (-1 if unreached)."""
+    H, W = maze.shape
+    cells = maze.ravel()
+    dist = np.full(H * W, -1, np.int32)
+    parents = np.full(H * W, -1, np.int32)
+    visited = np.zeros(H * W, np.bool_)
+    queue = np.empty(H * W, np.int32)
+    offsets = DX * W + DY
+    tail = 0
+    for source in sources:
+        if not visited[source]:
+            visited[source] = True
+            dist[source] = 0
+            parents[source] = source
+            queue[tail] = source
+            tail += 1
+    level_start, level_end = 0, tail
+    depth = 0
+    while level_start < level_end:
+        depth += 1
+        for i in range(level_start, level_end):
+            cell = queue[i]
+            for k in range(4):
+                neighbor = cell + offsets[k]
+                if (cells[neighbor] == 1) & (not visited[neighbor]):
+                    visited[neighbor] = True
+                    dist[neighbor] = depth
+                    parents[neighbor] = cell
+                    queue[tail] = neighbor
+                    tail += 1
+        level_start, level_end = level_end, tail
+    return dist, parents
+
+
+def bfs_multisource(problem, sources):
+    """Breadth-first distances in a MazePuzzle maze from the nearest of the
+    given source cells (maze coordinates) to every cell, in one search
+    instead of one breadth_first_graph_search per source. Return (dist,
+    parents), int32 arrays with the maze's shape: dist is -1 for unreachable
+    cells, and parents holds the flat index x * W + y of the previous cell on
+    a shortest path from the nearest source (the cell itself for a source,
+    -1 if unreachable). Raises ValueError if a source is outside the maze."""
+    H, W = problem.shape
+    for source in sources:
+        check_cell(source, (H - 2, W - 2))
+    sources = np.array([problem.encode(source) for source in sources], np.int32)
+    dist, parents = bfs_multisource_grid(problem.grid, sources)
+    dist = dist.reshape(H, W)[1:-1, 1:-1]
+    # Grid indices of the padded grid are converted back to maze indices
+    px, py = np.divmod(parents.reshape(H, W)[1:-1, 1:-1], W)
+    parents = np.where(px >= 0, (px - 1) * (W - 2) + (py - 1), -1).astype(np.int32)
+    return dist, parents
@@ -5,6 +5,7 @@ import collections
 import collections.abc
 import functools
 import heapq
+import itertools
 import operator
 import os.path
 import random
@@ -35,6 +36,12 @@ def memoize(fn, slot=None, maxsize=32):
             return fn(*args)
 
     return memoized_fn
+class FlagDict(dict):
+    """A dict of flags in which missing keys read as False without being
+    stored, so it can stand in for a bitmap indexed by arbitrary keys."""
+
+    def __missing__(self, key):
+        return False
 # ______________________________________________________________________________
 # Queues: Stack, FIFOQueue, PriorityQueue
 # Stack and FIFOQueue are implemented as list and collection.deque
@@ -96,4 +103,128 @@ class PriorityQueue:
             raise KeyError(str(key) + " is not in the priority queue")
         heapq.heapify(self.heap)
 
-# ______________________________________________________________________________
\ No newline at end of file
+# ______________________________________________________________________________
+class HeapPQ:
+    """A PriorityQueue of search nodes that also keeps an index from each
+    node's state to its heap entry, so membership, lookup and deletion no
+    longer scan the heap. Entries are keyed by node.state rather than by the
+    node, so at most one node per state is queued. Deleted or replaced
+    entries are only marked as removed and are skipped when they reach the
+    top of the heap."""
+
+    REMOVED = object()
+
+    def __init__(self, order='min', f=lambda x: x):
+        self.heap = []
+        self.entry_finder = {}
+        self.counter = itertools.count()
+        if order == 'min':
+            self.f = f
+        elif order == 'max':  # now item with max f(x)
+            self.f = lambda x: -f(x)  # will be popped first
+        else:
+            raise ValueError("Order must be either 'min' or 'max'.")
+
+    def append(self, item):
+        """Insert item unless a node for the same state is already queued with
+        an equal or better value; a worse queued node is replaced."""
+        value = self.f(item)
+        old = self.entry_finder.get(item.state)
+        if old is not None:
+            if old[0] <= value:
+                return
+            old[-1] = self.REMOVED
+        entry = [value, next(self.counter), item]
+        self.entry_finder[item.state] = entry
+        heapq.heappush(self.heap, entry)
+
+    def extend(self, items):
+        """Insert each item in items at its correct position."""
+        for item in items:
+            self.append(item)
+
+    def pop(self):
+        """Pop and return the item (with min or max f(x) value)
+        depending on the order."""
+        while self.heap:
+            item = heapq.heappop(self.heap)[-1]
+            if item is not self.REMOVED:
+                del self.entry_finder[item.state]
+                return item
+        raise Exception('Trying to pop from empty PriorityQueue.')
+
+    def __len__(self):
+        """Return the number of live items in the queue."""
+        return len(self.entry_finder)
+
+    def __contains__(self, key):
+        """Return True if a node for the key's state is in the queue."""
+        return key.state in self.entry_finder
+
+    def __getitem__(self, key):
+        """Returns the value of the node queued for the key's state.
+        Raises KeyError if key is not present."""
+        try:
+            return self.entry_finder[key.state][0]
+        except KeyError:
+            raise KeyError(str(key) + " is not in the priority queue")
+
+    def __delitem__(self, key):
+        """Delete the entry stored for the key's state."""
+        try:
+            entry = self.entry_finder.pop(key.state)
+        except KeyError:
+            raise KeyError(str(key) + " is not in the priority queue")
+        entry[-1] = self.REMOVED
+
+# ______________________________________________________________________________
+class BucketPQ(HeapPQ):
+    """A drop-in replacement for HeapPQ when f(x) is a small non-negative int,
+    as with unit step costs and an integer heuristic. Nodes are kept in one
+    FIFO bucket per f value and pop scans forward from the lowest non-empty
+    bucket, so append and pop take O(1) amortized time instead of O(log n).
+    The state index, membership, lookup and lazy deletion are inherited from
+    HeapPQ. Only the 'min' order is supported."""
+
+    def __init__(self, order='min', f=lambda x: x):
+        if order != 'min':
+            raise ValueError("BucketPQ only supports the 'min' order.")
+        self.f = f
+        self.buckets = []
+        self.min_f = 0
+        self.entry_finder = {}
+
+    def append(self, item):
+        """Insert item unless a node for the same state is already queued with
+        an equal or better value; a worse queued node is replaced. Raises
+        ValueError if f(item) is not a non-negative int."""
+        value = self.f(item)
+        if not isinstance(value, int) or value < 0:
+            raise ValueError("BucketPQ needs f(x) to be a non-negative int, got {!r}.".format(value))
+        old = self.entry_finder.get(item.state)
+        if old is not None:
+            if old[0] <= value:
+                return
+            old[-1] = self.REMOVED
+        if value >= len(self.buckets):
+            self.buckets.extend(collections.deque() for _ in range(value + 1 - len(self.buckets)))
+        if value < self.min_f:
+            self.min_f = value
+        entry = [value, item]
+        self.entry_finder[item.state] = entry
+        self.buckets[value].append(entry)
+
+    def pop(self):
+        """Pop and return the item with min f(x) value, oldest first among
+        items with equal values."""
+        while self.min_f < len(self.buckets):
+            bucket = self.buckets[self.min_f]
+            while bucket:
+                item = bucket.popleft()[-1]
+                if item is not self.REMOVED:
+                    del self.entry_finder[item.state]
+                    return item
+            self.min_f += 1
+        raise Exception('Trying to pop from empty PriorityQueue.')
+
+# ______________________________________________________________________________